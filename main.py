@@ -9,7 +9,9 @@ This server exposes PostgreSQL database functionality through MCP:
 import asyncio
 import logging
 import os
+import re
 import sys
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
@@ -18,7 +20,9 @@ from typing import Any
 import psycopg
 from dotenv import load_dotenv
 from psycopg import sql
-from psycopg.rows import dict_row
+from psycopg.conninfo import conninfo_to_dict
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import AsyncConnectionPool
 
 from mcp.server.fastmcp import Context, FastMCP
 from mcp.server.session import ServerSession
@@ -26,6 +30,14 @@ from mcp.server.session import ServerSession
 # Fix for Windows: psycopg requires SelectorEventLoop
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+else:
+    # Use uvloop for faster socket I/O and task scheduling when it is installed
+    try:
+        import uvloop  # pyright: ignore[reportMissingImports]
+    except ImportError:
+        pass
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 # Load environment variables
 load_dotenv()
@@ -34,17 +46,93 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Leading keyword check for read-only queries in execute_query
+_LEAD_RE = re.compile(r"\s*([A-Za-z]+)")
+_STACKED_RE = re.compile(r";\s*\S")
+_READ_ONLY_KEYWORDS = frozenset({"SELECT", "WITH", "SHOW"})
 
-@dataclass
-class DatabaseContext:
-    """Database connection context."""
+# Upper bound on rows returned by execute_query
+MAX_QUERY_ROWS = 10_000
 
-    conn: psycopg.AsyncConnection[dict[str, Any]]
+# Table/schema metadata only changes on DDL, so cache it briefly in-process
+METADATA_CACHE_TTL = 60.0
 
+_meta_cache: dict[tuple[str, ...], tuple[float, Any]] = {}
+_meta_cache_lock = asyncio.Lock()
 
-@asynccontextmanager
-async def database_lifespan(server: FastMCP) -> AsyncIterator[DatabaseContext]:
-    """Manage database connection lifecycle."""
+
+async def _cache_get(key: tuple[str, ...]) -> Any | None:
+    """Return a cached metadata value, or None if missing or expired."""
+    async with _meta_cache_lock:
+        entry = _meta_cache.get(key)
+        if entry is None:
+            return None
+        ts, value = entry
+        if time.monotonic() - ts >= METADATA_CACHE_TTL:
+            del _meta_cache[key]
+            return None
+        return value
+
+
+async def _cache_set(key: tuple[str, ...], value: Any) -> None:
+    """Store a metadata value in the cache."""
+    async with _meta_cache_lock:
+        _meta_cache[key] = (time.monotonic(), value)
+
+
+async def _cache_set_tables(tables: dict[str, Any]) -> None:
+    """Store the list_tables result and its table-name set with one timestamp.
+
+    Sharing the timestamp means the name set used for validation never
+    outlives the table list it was built from.
+    """
+    known_tables = frozenset(t["table_name"] for t in tables["tables"])
+    async with _meta_cache_lock:
+        ts = time.monotonic()
+        _meta_cache[("list_tables",)] = (ts, tables)
+        _meta_cache[("known_tables",)] = (ts, known_tables)
+
+
+async def _load_tables(
+    pool: AsyncConnectionPool[psycopg.AsyncConnection[dict[str, Any]]],
+) -> dict[str, Any]:
+    """Return the list_tables result, querying the catalog on a cache miss."""
+    cache_key = ("list_tables",)
+    cached = await _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    query = """
+        SELECT table_name, table_type
+        FROM information_schema.tables
+        WHERE table_schema = 'public'
+        ORDER BY table_name;
+    """
+
+    async with pool.connection() as conn:
+        # Metadata queries run on every call; prepare them server-side
+        cur = await conn.execute(query, prepare=True)
+        tables = await cur.fetchall()
+
+    result = {"tables": tables, "count": len(tables)}
+    await _cache_set_tables(result)
+    return result
+
+
+async def _get_known_tables(
+    pool: AsyncConnectionPool[psycopg.AsyncConnection[dict[str, Any]]],
+) -> frozenset[str]:
+    """Return the names of all public tables, refreshed with the table list."""
+    cached = await _cache_get(("known_tables",))
+    if cached is not None:
+        return cached
+
+    tables = await _load_tables(pool)
+    return frozenset(t["table_name"] for t in tables["tables"])
+
+
+def _build_database_url() -> str:
+    """Build the psycopg connection URL from environment variables."""
     # Try to get DATABASE_URL first, otherwise construct from individual components
     database_url = os.getenv("DATABASE_URL")
 
@@ -61,53 +149,119 @@ async def database_lifespan(server: FastMCP) -> AsyncIterator[DatabaseContext]:
                 "DATABASE_PASSWORD is required. Set DATABASE_PASSWORD or DATABASE_URL in .env file"
             )
 
-        database_url = (
-            f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-        )
         logger.info("Constructed database URL from individual components")
-    else:
-        # Remove SQLAlchemy-specific prefix if present
-        database_url = database_url.replace("postgresql+psycopg://", "postgresql://")
+        return f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+    # Remove SQLAlchemy-specific prefix if present
+    return database_url.replace("postgresql+psycopg://", "postgresql://")
+
+
+# Resolve connection settings at import so config errors surface before startup
+_DB_URL = _build_database_url()
+
+
+@dataclass
+class DatabaseContext:
+    """Database connection pool context."""
+
+    pool: AsyncConnectionPool[psycopg.AsyncConnection[dict[str, Any]]]
+
+
+async def _prefetch_metadata(
+    pool: AsyncConnectionPool[psycopg.AsyncConnection[dict[str, Any]]],
+) -> None:
+    """Seed the metadata cache with every public table and its columns.
+
+    Uses a single catalog query so the first list_tables/get_table_schema
+    calls don't each need their own round-trip.
+    """
+    query = """
+        SELECT
+            t.table_name,
+            t.table_type,
+            c.column_name,
+            c.data_type,
+            c.character_maximum_length,
+            c.is_nullable,
+            c.column_default
+        FROM information_schema.tables t
+        LEFT JOIN information_schema.columns c
+            ON c.table_schema = t.table_schema AND c.table_name = t.table_name
+        WHERE t.table_schema = 'public'
+        ORDER BY t.table_name, c.ordinal_position;
+    """
 
-    logger.info(
-        f"Connecting to PostgreSQL database at {os.getenv('DATABASE_HOST')}:{os.getenv('DATABASE_PORT')}/{os.getenv('DATABASE_NAME')}..."
-    )
-    conn: psycopg.AsyncConnection[dict[str, Any]] | None = None
     try:
-        conn = await psycopg.AsyncConnection.connect(
-            database_url,
-            row_factory=dict_row,  # type: ignore[arg-type]
-            autocommit=True,
+        async with pool.connection() as conn:
+            cur = await conn.execute(query)
+            rows = await cur.fetchall()
+    except Exception:
+        logger.exception("Failed to prefetch table metadata")
+        return
+
+    tables: list[dict[str, Any]] = []
+    schemas: dict[str, list[dict[str, Any]]] = {}
+    for row in rows:
+        table_name = row.pop("table_name")
+        table_type = row.pop("table_type")
+        if table_name not in schemas:
+            tables.append({"table_name": table_name, "table_type": table_type})
+            schemas[table_name] = []
+        if row["column_name"] is not None:
+            schemas[table_name].append(row)
+
+    await _cache_set_tables({"tables": tables, "count": len(tables)})
+    for table_name, columns in schemas.items():
+        if columns:
+            await _cache_set(
+                ("schema", table_name),
+                {
+                    "table_name": table_name,
+                    "columns": columns,
+                    "column_count": len(columns),
+                },
+            )
+    logger.info("Prefetched metadata for %d tables", len(tables))
+
+
+@asynccontextmanager
+async def database_lifespan(server: FastMCP) -> AsyncIterator[DatabaseContext]:
+    """Manage database connection pool lifecycle."""
+    # Read the target from the resolved URL so it is correct for DATABASE_URL too
+    params = conninfo_to_dict(_DB_URL)
+    host, port, name = params.get("host"), params.get("port"), params.get("dbname")
+    logger.info("Connecting to PostgreSQL database at %s:%s/%s...", host, port, name)
+    pool: AsyncConnectionPool[psycopg.AsyncConnection[dict[str, Any]]] | None = None
+    try:
+        pool = AsyncConnectionPool(
+            _DB_URL,
+            min_size=4,
+            max_size=16,
+            kwargs={"row_factory": dict_row, "autocommit": True},
+            open=False,
         )
-        if conn is None:
-            raise RuntimeError("Failed to establish database connection")
+        await pool.open()
+        await pool.wait()
         logger.info("✓ Connected to PostgreSQL database successfully")
-        yield DatabaseContext(conn=conn)
+        await _prefetch_metadata(pool)
+        yield DatabaseContext(pool=pool)
     except psycopg.OperationalError as e:
-        logger.error(f"Database connection error: {e}")
+        logger.error("Database connection error: %s", e)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error during database connection: {e}")
+        logger.error("Unexpected error during database connection: %s", e)
         raise
     finally:
-        if conn is not None:
-            await conn.close()
-            logger.info("Database connection closed")
+        if pool is not None:
+            await pool.close()
+            logger.info("Database connection pool closed")
 
 
 # Initialize FastMCP server with database lifespan
 mcp = FastMCP("PostgreSQL Server", lifespan=database_lifespan)
 
 
-# Simple test resource to verify resources work
-@mcp.resource(
-    "postgres://info",
-    name="Server Info",
-    description="PostgreSQL server information",
-)
-def server_info() -> str:
-    """Get server information."""
-    return """# PostgreSQL MCP Server
+_SERVER_INFO = """# PostgreSQL MCP Server
 
 This server provides access to your PostgreSQL database through MCP.
 
@@ -121,31 +275,66 @@ This server provides access to your PostgreSQL database through MCP.
 """
 
 
+# Simple test resource to verify resources work
+@mcp.resource(
+    "postgres://info",
+    name="Server Info",
+    description="PostgreSQL server information",
+)
+def server_info() -> str:
+    """Get server information."""
+    return _SERVER_INFO
+
+
 # Convert database operations to tools (resources don't support async + Context)
 
+_TABLE_SCHEMA_QUERY = """
+    SELECT
+        column_name,
+        data_type,
+        character_maximum_length,
+        is_nullable,
+        column_default
+    FROM information_schema.columns
+    WHERE table_schema = 'public' AND table_name = %s
+    ORDER BY ordinal_position;
+"""
+
+# Formatted with the quoted table identifier for the row count
+_TABLE_STATS_QUERY = sql.SQL(
+    """
+    SELECT
+        (SELECT COUNT(*) FROM {}) as count,
+        pg_size_pretty(pg_total_relation_size(%s)) as total_size,
+        pg_size_pretty(pg_relation_size(%s)) as table_size,
+        pg_size_pretty(pg_indexes_size(%s)) as indexes_size
+    """
+)
+
+
+def _format_table_stats(result: dict[str, Any] | None) -> dict[str, Any]:
+    """Convert a table stats row into the tool response fields."""
+    return {
+        "row_count": result["count"] if result else 0,
+        "total_size": result["total_size"] if result else "Unknown",
+        "table_size": result["table_size"] if result else "Unknown",
+        "indexes_size": result["indexes_size"] if result else "Unknown",
+    }
+
 
 @mcp.tool()
 async def list_tables(ctx: Context[ServerSession, DatabaseContext]) -> dict[str, Any]:
     """List all tables in the database.
 
+    Results are cached for METADATA_CACHE_TTL seconds.
+
     Returns:
         Dictionary with list of tables and their types
     """
-    db = ctx.request_context.lifespan_context.conn
-
-    query = """
-        SELECT table_name, table_type
-        FROM information_schema.tables
-        WHERE table_schema = 'public'
-        ORDER BY table_name;
-    """
+    pool = ctx.request_context.lifespan_context.pool
 
     try:
-        async with db.cursor() as cur:
-            await cur.execute(query)
-            tables = await cur.fetchall()
-
-        return {"tables": tables, "count": len(tables)}
+        return await _load_tables(pool)
     except Exception:
         logger.exception("Failed to list tables")
         raise
@@ -158,29 +347,32 @@ async def get_table_schema(
 ) -> dict[str, Any]:
     """Get the schema for a specific table.
 
+    Results are cached for METADATA_CACHE_TTL seconds.
+
     Args:
         table_name: Name of the table to describe
 
     Returns:
         Dictionary with table schema information
     """
-    db = ctx.request_context.lifespan_context.conn
+    cache_key = ("schema", table_name)
+    cached = await _cache_get(cache_key)
+    if cached is not None:
+        return cached
 
-    query = """
-        SELECT
-            column_name,
-            data_type,
-            character_maximum_length,
-            is_nullable,
-            column_default
-        FROM information_schema.columns
-        WHERE table_schema = 'public' AND table_name = %s
-        ORDER BY ordinal_position;
-    """
+    pool = ctx.request_context.lifespan_context.pool
 
     try:
-        async with db.cursor() as cur:
-            await cur.execute(query, (table_name,))
+        # Reject unknown tables without a round-trip
+        if table_name not in await _get_known_tables(pool):
+            return {
+                "error": f"Table '{table_name}' not found",
+                "table_name": table_name,
+                "columns": [],
+            }
+
+        async with pool.connection() as conn:
+            cur = await conn.execute(_TABLE_SCHEMA_QUERY, (table_name,), prepare=True)
             columns = await cur.fetchall()
 
         if not columns:
@@ -190,52 +382,114 @@ async def get_table_schema(
                 "columns": [],
             }
 
-        return {
+        result = {
             "table_name": table_name,
             "columns": columns,
             "column_count": len(columns),
         }
+        await _cache_set(cache_key, result)
+        return result
     except Exception:
         logger.exception("Failed to get table schema for %s", table_name)
         raise
 
 
+@mcp.tool()
+async def invalidate_metadata_cache() -> dict[str, Any]:
+    """Clear cached table and schema metadata.
+
+    Call this after DDL changes so list_tables and get_table_schema
+    reflect the current database structure.
+
+    Returns:
+        Dictionary with the number of cache entries cleared
+    """
+    async with _meta_cache_lock:
+        cleared = len(_meta_cache)
+        _meta_cache.clear()
+
+    return {"cleared": cleared}
+
+
 @mcp.tool()
 async def execute_query(
     query: str,
     ctx: Context[ServerSession, DatabaseContext],
+    max_rows: int = MAX_QUERY_ROWS,
 ) -> dict[str, Any]:
     """Execute a read-only SQL query and return results.
 
     Args:
         query: SQL query to execute (must be SELECT, WITH, or SHOW statement)
+        max_rows: Maximum number of rows to return (capped at MAX_QUERY_ROWS)
 
     Returns:
-        Dictionary containing rows and metadata
+        Dictionary containing column names, rows as value lists in column order,
+        and whether the result was truncated
     """
-    db = ctx.request_context.lifespan_context.conn
+    pool = ctx.request_context.lifespan_context.pool
 
     # Ensure query is read-only
-    query_upper = query.strip().upper()
-    if not any(query_upper.startswith(prefix) for prefix in ("SELECT", "WITH", "SHOW")):
+    m = _LEAD_RE.match(query)
+    keyword = m.group(1).upper() if m else ""
+    if keyword not in _READ_ONLY_KEYWORDS:
         return {
             "error": "Only SELECT, WITH, and SHOW queries are allowed",
             "rows": [],
             "row_count": 0,
         }
 
+    # Reject stacked statements such as "SHOW x; DROP TABLE users". SELECT/WITH
+    # are declared as a server-side cursor, which Postgres already limits to a
+    # single statement; only SHOW goes through the simple-query protocol.
+    if keyword == "SHOW" and _STACKED_RE.search(query):
+        return {
+            "error": "Only a single statement is allowed",
+            "rows": [],
+            "row_count": 0,
+        }
+
+    if max_rows < 1:
+        return {
+            "error": "max_rows must be at least 1",
+            "rows": [],
+            "row_count": 0,
+        }
+    max_rows = min(max_rows, MAX_QUERY_ROWS)
+
     try:
-        async with db.cursor() as cur:
-            await cur.execute(sql.SQL(query))  # type: ignore[arg-type]
-            rows = await cur.fetchall()
+        # Return rows as tuples with a shared column list to keep wide results small
+        rows: list[tuple[Any, ...]]
+        columns: list[str]
+        async with pool.connection() as conn:
+            if keyword == "SHOW":
+                # SHOW cannot be declared as a server-side cursor
+                async with conn.cursor(row_factory=tuple_row) as cur:
+                    await cur.execute(query)  # type: ignore[arg-type]
+                    columns = [d.name for d in cur.description or ()]
+                    rows = await cur.fetchmany(max_rows + 1)
+            else:
+                # Server-side cursor so the backend only sends the rows we keep
+                async with (
+                    conn.transaction(),
+                    conn.cursor(name="mcp_exec", row_factory=tuple_row) as cur,
+                ):
+                    await cur.execute(query)  # type: ignore[arg-type]
+                    columns = [d.name for d in cur.description or ()]
+                    rows = await cur.fetchmany(max_rows + 1)
+
+        # Fetching one extra row tells us whether the result was cut off
+        truncated = len(rows) > max_rows
+        del rows[max_rows:]
 
         return {
             "rows": rows,
             "row_count": len(rows),
-            "columns": list(rows[0].keys()) if rows else [],
+            "columns": columns,
+            "truncated": truncated,
         }
     except Exception:
-        logger.exception("Failed to execute query")
+        logger.exception("Failed to execute query: %s", query)
         raise
 
 
@@ -252,58 +506,97 @@ async def get_table_stats(
     Returns:
         Dictionary containing table statistics
     """
-    db = ctx.request_context.lifespan_context.conn
+    pool = ctx.request_context.lifespan_context.pool
 
     try:
-        # Get row count
-        async with db.cursor() as cur:
-            count_query = sql.SQL("SELECT COUNT(*) as count FROM {}").format(
-                sql.Identifier(table_name)
-            )
-            await cur.execute(count_query)  # type: ignore[arg-type]
-            count_result = await cur.fetchone()
-            row_count = count_result["count"] if count_result else 0
-
-        # Get table size
-        async with db.cursor() as cur:
-            await cur.execute(
-                sql.SQL(
-                    """
-                SELECT
-                    pg_size_pretty(pg_total_relation_size(%s)) as total_size,
-                    pg_size_pretty(pg_relation_size(%s)) as table_size,
-                    pg_size_pretty(pg_indexes_size(%s)) as indexes_size
-                """
-                ),  # type: ignore[arg-type]
+        # Reject unknown tables without a round-trip
+        if table_name not in await _get_known_tables(pool):
+            return {
+                "error": f"Table '{table_name}' not found",
+                "table_name": table_name,
+            }
+
+        # Get row count and sizes in a single round-trip
+        async with pool.connection() as conn:
+            cur = await conn.execute(
+                _TABLE_STATS_QUERY.format(sql.Identifier(table_name)),
                 (table_name, table_name, table_name),
+                prepare=True,
             )
-            size_result = await cur.fetchone()
+            result = await cur.fetchone()
 
-        return {
-            "table_name": table_name,
-            "row_count": row_count,
-            "total_size": size_result["total_size"] if size_result else "Unknown",
-            "table_size": size_result["table_size"] if size_result else "Unknown",
-            "indexes_size": size_result["indexes_size"] if size_result else "Unknown",
-        }
+        return {"table_name": table_name, **_format_table_stats(result)}
     except Exception:
         logger.exception("Failed to get table stats for %s", table_name)
         raise
 
 
-@mcp.prompt()
-def analyze_table(table_name: str) -> str:
-    """Generate a prompt for analyzing a table.
+@mcp.tool()
+async def describe_table(
+    table_name: str,
+    ctx: Context[ServerSession, DatabaseContext],
+) -> dict[str, Any]:
+    """Get the schema and statistics for a table in one call.
+
+    Sends the schema and statistics queries together in a single pipeline,
+    instead of one round-trip each for get_table_schema and get_table_stats.
 
     Args:
-        table_name: Name of the table to analyze
+        table_name: Name of the table to describe
+
+    Returns:
+        Dictionary with table schema information and statistics
     """
-    return f"""Please analyze the table '{table_name}' in the database.
+    pool = ctx.request_context.lifespan_context.pool
+
+    try:
+        # Reject unknown tables without a round-trip
+        if table_name not in await _get_known_tables(pool):
+            return {
+                "error": f"Table '{table_name}' not found",
+                "table_name": table_name,
+                "columns": [],
+            }
+
+        # Skip the schema query when get_table_schema already cached it
+        schema_key = ("schema", table_name)
+        schema: dict[str, Any] | None = await _cache_get(schema_key)
+
+        async with pool.connection() as conn:
+            async with conn.pipeline():
+                schema_cur = None
+                if schema is None:
+                    schema_cur = await conn.execute(
+                        _TABLE_SCHEMA_QUERY, (table_name,), prepare=True
+                    )
+                stats_cur = await conn.execute(
+                    _TABLE_STATS_QUERY.format(sql.Identifier(table_name)),
+                    (table_name, table_name, table_name),
+                    prepare=True,
+                )
+            # Leaving the pipeline block syncs both queries in one round-trip
+            stats = await stats_cur.fetchone()
+            if schema_cur is not None:
+                columns = await schema_cur.fetchall()
+                schema = {
+                    "table_name": table_name,
+                    "columns": columns,
+                    "column_count": len(columns),
+                }
+                if columns:
+                    await _cache_set(schema_key, schema)
+
+        return {**(schema or {}), **_format_table_stats(stats)}
+    except Exception:
+        logger.exception("Failed to describe table %s", table_name)
+        raise
+
+
+_ANALYZE_TABLE_TMPL = """Please analyze the table '{table_name}' in the database.
 
-1. First, get the table schema to understand its structure
-2. Get table statistics to understand its size and distribution
-3. Examine a sample of rows to understand the data
-4. Provide insights about:
+1. First, call describe_table to get its schema, size and row count in one call
+2. Examine a sample of rows to understand the data
+3. Provide insights about:
    - Data quality
    - Potential issues or anomalies
    - Interesting patterns or trends
@@ -313,9 +606,16 @@ Use the available tools to gather this information."""
 
 
 @mcp.prompt()
-def find_relationships() -> str:
-    """Generate a prompt for finding table relationships."""
-    return """Please analyze the database to find relationships between tables.
+def analyze_table(table_name: str) -> str:
+    """Generate a prompt for analyzing a table.
+
+    Args:
+        table_name: Name of the table to analyze
+    """
+    return _ANALYZE_TABLE_TMPL.format(table_name=table_name)
+
+
+_FIND_RELATIONSHIPS_PROMPT = """Please analyze the database to find relationships between tables.
 
 1. List all tables in the database
 2. Examine the schemas of each table
@@ -332,9 +632,12 @@ Use the available tools to gather this information."""
 
 
 @mcp.prompt()
-def data_quality_check() -> str:
-    """Generate a prompt for checking data quality."""
-    return """Please perform a comprehensive data quality check on the database.
+def find_relationships() -> str:
+    """Generate a prompt for finding table relationships."""
+    return _FIND_RELATIONSHIPS_PROMPT
+
+
+_DATA_QUALITY_PROMPT = """Please perform a comprehensive data quality check on the database.
 
 For each table:
 1. Check for NULL values in important columns
@@ -349,6 +652,12 @@ and recommendations for improvement.
 Use the available tools to gather this information."""
 
 
+@mcp.prompt()
+def data_quality_check() -> str:
+    """Generate a prompt for checking data quality."""
+    return _DATA_QUALITY_PROMPT
+
+
 def main() -> None:
     """Run the MCP server."""
     logger.info("Starting PostgreSQL MCP Server...")